@@ -56,6 +56,7 @@ from .ticket import (
     normalize_ticket,
 )
 from .workflow import (
+    clear_workflow_config_cache,
     expand_format,
     get_exclude_patterns,
     get_local_branch_format,
@@ -71,6 +72,7 @@ __all__ = (
     "apply_user_template",
     "branch_matches_ticket",
     "build_branch_description",
+    "clear_workflow_config_cache",
     "current_branch",
     "direnv_allow",
     "enable_worktree_config",
@@ -1,5 +1,6 @@
 """Core git operations."""
 
+import os
 import subprocess
 from collections.abc import Iterable, Iterator
 from pathlib import Path
@@ -264,24 +265,35 @@ def find_branches(
     return [m for m in all_matches if not (m in seen or seen.add(m))]
 
 
-def submodule_update(repo: str | Path | None = None) -> None:
+def submodule_update(repo: str | Path | None = None, *, jobs: int | None = None) -> None:
     """
     Update submodules in the repository recursively.
 
     Args:
         repo: Path to the Git repository. Defaults to current directory.
+        jobs: Number of submodules to clone in parallel. Defaults to the
+            `submodule.fetchJobs` config value, or the number of CPUs if
+            that is unset or 0.
 
     Example:
         submodule_update()
-        submodule_update(Path("/path/to/repo"))
+        submodule_update(Path("/path/to/repo"), jobs=4)
     """
     repo_path = resolve_repo(repo)
 
+    # An explicit --jobs overrides submodule.fetchJobs, so read it first. The
+    # CPU count is spelled out rather than passing --jobs=0: `git submodule
+    # update` doesn't treat 0 as "pick a default" the way `git fetch` does.
+    if jobs is None:
+        fetch_jobs = git_config("submodule.fetchJobs", repo=repo_path, default="0")
+        jobs = int(fetch_jobs) or os.cpu_count() or 1
+
     run_git(
         "submodule",
         "update",
         "--init",
         "--recursive",
+        f"--jobs={jobs}",
         repo=repo_path,
         stdout=subprocess.DEVNULL,
     )
@@ -25,6 +25,15 @@ from .git import (
 )
 from .workflow import expand_format, get_workflow_config
 
+# Default pattern matches common ticket formats:
+# - PROJ-123 (Jira-style)
+# - #123 (GitHub-style)
+# A project key is only tried from the start of a run of letters. The
+# leftmost match always starts there anyway, and without the lookbehind a
+# long run of letters not followed by "-<digits>" is rescanned from every
+# position in it, which takes quadratic time.
+_DEFAULT_TICKET_RE = re.compile(r"((?<![A-Z])[A-Z]+-\d+|#\d+)", re.IGNORECASE)
+
 
 def normalize_ticket(ticket: str, repo: Path | None = None) -> str:
     """
@@ -101,7 +110,7 @@ def get_branch_commit_message(branch: str, repo: Path | None = None) -> str | No
 def extract_ticket_from_branch(
     branch: str | None = None,
     repo: Path | None = None,
-    pattern: str | None = None,
+    pattern: str | re.Pattern[str] | None = None,
 ) -> str | None:
     """
     Extract a ticket from a branch.
@@ -120,7 +129,8 @@ def extract_ticket_from_branch(
         branch: Branch name. If None, uses current branch.
         repo: Repository path. If None, uses current directory.
         pattern: Regex pattern for ticket matching. Should have a single
-                 capture group for the full ticket.
+                 capture group for the full ticket. Strings are matched
+                 case-insensitively; a compiled pattern is used as-is.
 
     Returns:
         Ticket if found (uppercased), otherwise None.
@@ -130,10 +140,12 @@ def extract_ticket_from_branch(
         if not (branch := current_branch(repo=repo)):
             return None
 
-    # Default pattern matches common ticket formats:
-    # - PROJ-123 (Jira-style)
-    # - #123 (GitHub-style)
-    ticket_re = re.compile(pattern or r"([A-Z]+-\d+|#\d+)", re.IGNORECASE)
+    if pattern is None:
+        ticket_re = _DEFAULT_TICKET_RE
+    elif isinstance(pattern, re.Pattern):
+        ticket_re = pattern
+    else:
+        ticket_re = re.compile(pattern, re.IGNORECASE)
 
     # 1. Search branch name
     if match := ticket_re.search(branch):
@@ -1,11 +1,18 @@
 """Workflow configuration and format string utilities."""
 
 import re
+from functools import lru_cache
 from pathlib import Path, PurePosixPath
 from urllib.parse import urlsplit
 
 from .git import git_config, run_git, user_email_in_this_working_copy
-from .paths import resolve_repo
+from .paths import resolve_path, resolve_repo
+
+
+@lru_cache(maxsize=256)
+def _cached_workflow_config(key: str, repo: Path) -> str | None:
+    """Read `workflow.<key>` once per (key, repo); see `get_workflow_config`."""
+    return git_config(f"workflow.{key}", repo=repo)
 
 
 def get_workflow_config(
@@ -16,7 +23,9 @@ def get_workflow_config(
     """
     Get a workflow configuration value.
 
-    Reads from git config under the `workflow.*` namespace.
+    Reads from git config under the `workflow.*` namespace. Each key is read
+    from git once per repository and then cached for the life of the
+    process; call `clear_workflow_config_cache()` after changing config.
 
     Args:
         key: Config key without the "workflow." prefix (e.g., "ticket.prefix").
@@ -31,7 +40,23 @@ def get_workflow_config(
         url_pattern = get_workflow_config("ticket.urlPattern")
 
     """
-    return git_config(f"workflow.{key}", repo=repo, default=default)
+    value = _cached_workflow_config(key, resolve_path(repo))
+    return default if value is None else value
+
+
+def clear_workflow_config_cache() -> None:
+    """
+    Forget cached `workflow.*` config values.
+
+    Call after changing workflow config in a running process, so the next
+    `get_workflow_config` reads the new value from git.
+
+    Example:
+        run_git("config", "workflow.ticket.prefix", "SE-")
+        clear_workflow_config_cache()
+
+    """
+    _cached_workflow_config.cache_clear()
 
 
 def expand_format(format_string: str, **placeholders: str) -> str:
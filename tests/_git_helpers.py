@@ -0,0 +1,323 @@
+"""
+Setup helpers for tests that need to shape a repository before exercising it.
+
+Spawning `git` costs far more than the assertions it sets up, so these helpers
+edit refs and config in-process where git's on-disk formats make that simple,
+and only shell out for operations that need git itself (staging, committing).
+"""
+
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+# Resolved once so each spawn skips the PATH search for git and git skips
+# rediscovering where its own subcommands live.
+GIT = shutil.which("git") or "git"
+_GIT_ENV = {
+    "GIT_EXEC_PATH": subprocess.check_output([GIT, "--exec-path"], text=True).strip(),
+    # Don't take optional locks (e.g. `git status` refreshing the index)
+    "GIT_OPTIONAL_LOCKS": "0",
+    "GIT_TERMINAL_PROMPT": "0",
+}
+
+
+def _git_env(**extra: str) -> dict[str, str]:
+    """Build the environment for a setup git process."""
+    return {**os.environ, **_GIT_ENV, **extra}
+
+
+def run_git_fast(
+    *args: str,
+    cwd: Path,
+    capture: bool = False,
+    **env: str,
+) -> subprocess.CompletedProcess:
+    """
+    Run a setup git command in `cwd`, raising if it fails.
+
+    Output is discarded unless `capture` is set, so setup commands don't pay
+    for pipes nobody reads. Other keyword arguments are added to the
+    command's environment.
+    """
+    output = {"capture_output": True} if capture else {
+        "stdout": subprocess.DEVNULL,
+        "stderr": subprocess.DEVNULL,
+    }
+    return subprocess.run(
+        [GIT, *args],
+        cwd=cwd,
+        env=_git_env(**env),
+        check=True,
+        text=True,
+        **output,
+    )
+
+
+def sh(script: str, cwd: Path) -> None:
+    """
+    Run a shell script in `cwd`, failing if any command in it fails.
+
+    Chain several setup commands with `&&` to pay for one process instead of
+    one per command.
+    """
+    subprocess.run(
+        ["/bin/sh", "-c", script],
+        cwd=cwd,
+        env=_git_env(),
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def batch_init(paths: list[Path]) -> None:
+    """
+    Initialize empty git repositories at `paths`, all at once.
+
+    Each `git init` is independent, so they run concurrently and the batch
+    costs about as much as a single init.
+    """
+    for path in paths:
+        path.mkdir(parents=True, exist_ok=True)
+
+    env = _git_env()
+    procs = [
+        subprocess.Popen(
+            [GIT, "init", "-q"],
+            cwd=path,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for path in paths
+    ]
+    for path, proc in zip(paths, procs):
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, [GIT, "init", "-q", str(path)])
+
+
+def _read_ref(git_dir: Path, refname: str) -> str | None:
+    """Read a ref from its loose file or from packed-refs, following symrefs."""
+    loose = git_dir / refname
+    if loose.is_file():
+        value = loose.read_text().strip()
+        if value.startswith("ref: "):
+            return _read_ref(git_dir, value.removeprefix("ref: "))
+        return value
+
+    packed = git_dir / "packed-refs"
+    if packed.is_file():
+        for line in packed.read_text().splitlines():
+            if line.endswith(f" {refname}"):
+                return line.split(" ", 1)[0]
+
+    return None
+
+
+def rev_parse(repo: Path, rev: str = "HEAD") -> str:
+    """
+    Resolve `rev` to a commit id.
+
+    Refs are read straight from the repository; anything more elaborate than a
+    ref name (e.g. `HEAD~1`) is handed to `git rev-parse`.
+    """
+    git_dir = repo / ".git"
+    if rev == "HEAD" or rev.startswith("refs/"):
+        candidates = [rev]
+    else:
+        candidates = [f"refs/heads/{rev}", f"refs/remotes/{rev}"]
+
+    for refname in candidates:
+        if commit := _read_ref(git_dir, refname):
+            return commit
+
+    result = run_git_fast("rev-parse", "--verify", f"{rev}^{{commit}}", cwd=repo, capture=True)
+    return result.stdout.strip()
+
+
+def make_branches(repo: Path, refs: dict[str, str]) -> None:
+    """
+    Create several refs, each at its own start revision, in one go.
+
+    Keys are branch names, or full ref names (e.g. `refs/remotes/origin/x`)
+    for anything other than a local branch. Refs are written straight to
+    disk, without touching the index or working tree.
+    """
+    git_dir = repo / ".git"
+    for name, start in refs.items():
+        ref = git_dir / (name if name.startswith("refs/") else f"refs/heads/{name}")
+        commit = rev_parse(repo, start)
+        ref.parent.mkdir(parents=True, exist_ok=True)
+        ref.write_text(f"{commit}\n")
+
+
+def make_branch(
+    repo: Path,
+    name: str,
+    start: str = "HEAD",
+    *,
+    description: str | None = None,
+) -> None:
+    """
+    Create branch `name` at `start` without touching the index or working tree.
+
+    `description`, if given, is stored as `branch.<name>.description`, as
+    `git branch --edit-description` would.
+    """
+    make_branches(repo, {name: start})
+    if description is not None:
+        write_git_config(repo, {f"branch.{name}.description": description})
+
+
+def fake_push_upstream(
+    repo: Path,
+    local_branch: str,
+    remote_branch: str | None = None,
+    remote: str = "origin",
+) -> None:
+    """
+    Make `repo` look as if `git push -u remote local_branch:remote_branch` ran.
+
+    Writes the remote-tracking ref and the `branch.<local>.remote`/`.merge`
+    upstream config directly; no remote repository is contacted (or needed).
+    If `remote` isn't configured yet, its `url` and `fetch` entries are added
+    too, pointing at a path that doesn't exist, since git only resolves
+    `<branch>@{upstream}` for a configured remote. `remote_branch` defaults
+    to `local_branch`.
+    """
+    remote_branch = remote_branch or local_branch
+    make_branches(repo, {f"refs/remotes/{remote}/{remote_branch}": f"refs/heads/{local_branch}"})
+
+    entries = {
+        f"branch.{local_branch}.remote": remote,
+        f"branch.{local_branch}.merge": f"refs/heads/{remote_branch}",
+    }
+    config = (repo / ".git" / "config").read_text()
+    if f"[remote {_quote_config(remote)}]" not in config:
+        entries[f"remote.{remote}.url"] = str(repo.parent / f"{remote}.git")
+        entries[f"remote.{remote}.fetch"] = f"+refs/heads/*:refs/remotes/{remote}/*"
+    write_git_config(repo, entries)
+
+
+def switch_branch(repo: Path, name: str) -> None:
+    """
+    Create branch `name` at HEAD and make it the current branch.
+
+    Equivalent to `git checkout -b name`, but only writes the branch ref and
+    HEAD: the new branch points at the commit already checked out, so the
+    index and working tree are left as they are.
+    """
+    make_branch(repo, name)
+    (repo / ".git" / "HEAD").write_text(f"ref: refs/heads/{name}\n")
+
+
+def fabricate_worktree(main_repo: Path, worktree_path: Path) -> None:
+    """
+    Lay out a linked worktree of `main_repo` at `worktree_path` by hand.
+
+    Produces the same administrative files as `git worktree add` (a `.git`
+    file pointing into `main_repo/.git/worktrees/`), but skips the checkout,
+    so the worktree directory is otherwise empty.
+    """
+    admin_dir = main_repo / ".git" / "worktrees" / worktree_path.name
+    admin_dir.mkdir(parents=True)
+    (admin_dir / "HEAD").write_text(f"{rev_parse(main_repo)}\n")
+    (admin_dir / "commondir").write_text("../..\n")
+    (admin_dir / "gitdir").write_text(f"{worktree_path / '.git'}\n")
+
+    worktree_path.mkdir()
+    (worktree_path / ".git").write_text(f"gitdir: {admin_dir}\n")
+
+
+def _quote_config(value: str) -> str:
+    """Quote a value (or subsection name) using git config's escaping rules."""
+    escaped = (
+        value.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\t", "\\t")
+    )
+    return f'"{escaped}"'
+
+
+def write_git_config(repo: Path, entries: dict[str, str | list[str]]) -> None:
+    """
+    Set several git config values with a single append to `.git/config`.
+
+    Keys are full dotted names (`worktree.userTemplate.mode`); a list value
+    adds one line per item, like repeated `git config --add`. Behaves like
+    `git config --add`: for single-valued keys git uses the last value, so
+    this also overrides an earlier setting.
+    """
+    sections: dict[str, list[str]] = {}
+    for key, values in entries.items():
+        section, _, rest = key.partition(".")
+        subsection, _, name = rest.rpartition(".")
+        header = f"[{section} {_quote_config(subsection)}]" if subsection else f"[{section}]"
+        for value in [values] if isinstance(values, str) else values:
+            sections.setdefault(header, []).append(f"\t{name} = {_quote_config(value)}\n")
+
+    with (repo / ".git" / "config").open("a") as config:
+        config.write("".join(f"{header}\n{''.join(lines)}" for header, lines in sections.items()))
+
+
+def set_config(repo: Path, key: str, value: str) -> None:
+    """Set a single git config value; see `write_git_config`."""
+    write_git_config(repo, {key: value})
+
+
+def stage_file(repo: Path, path: str, content: str) -> None:
+    """Write `content` to `path` inside `repo` and stage it."""
+    (repo / path).write_text(content)
+    run_git_fast("add", path, cwd=repo)
+
+
+def stage_and_commit(
+    repo: Path,
+    path: str,
+    content: str,
+    message: str,
+    date: str | None = None,
+) -> None:
+    """
+    Write, stage, and commit a single file on the current branch.
+
+    `date`, if given, is used as both author and committer date so tests can
+    place commits in time without sleeping.
+    """
+    stage_file(repo, path, content)
+    dates = {"GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date} if date else {}
+    run_git_fast("commit", "-m", message, cwd=repo, **dates)
+
+
+def commit_file(repo: Path, path: str, content: str, message: str) -> None:
+    """
+    Commit a single file on top of the current branch with one `git fast-import`.
+
+    Unlike `stage_and_commit`, nothing is written to the working tree or the
+    index; only the new objects and the branch ref. Use it where tests only
+    read history (commit messages, logs), not the checkout.
+    """
+    branch = (repo / ".git" / "HEAD").read_text().strip().removeprefix("ref: ")
+    identity = f"{os.environ['GIT_COMMITTER_NAME']} <{os.environ['GIT_COMMITTER_EMAIL']}>"
+    message_bytes = message.encode()
+    content_bytes = content.encode()
+
+    stream = b"".join([
+        f"commit {branch}\n".encode(),
+        f"committer {identity} now\n".encode(),
+        f"data {len(message_bytes)}\n".encode(), message_bytes, b"\n",
+        f"from {branch}^0\n".encode(),
+        f"M 100644 inline {path}\n".encode(),
+        f"data {len(content_bytes)}\n".encode(), content_bytes, b"\n",
+    ])
+    subprocess.run(
+        [GIT, "fast-import", "--quiet", "--date-format=now"],
+        input=stream,
+        cwd=repo,
+        env=_git_env(),
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
@@ -1,74 +1,286 @@
 """Shared pytest fixtures for git-workflow-utils tests."""
 
+import os
+import shlex
+import shutil
 import subprocess
+import sys
 from pathlib import Path
 
 import pytest
 
+from _git_helpers import make_branches, sh, write_git_config
+from git_workflow_utils.workflow import clear_workflow_config_cache
+
+# Test repositories go on a RAM-backed filesystem when one is available, so
+# git's writes never wait on a disk. Set PYTEST_TMPFS to choose a different
+# directory, or to an empty string to keep pytest's default temp location.
+_DEFAULT_TMPFS = Path("/dev/shm")
+
+
+# Every git process in the session, including those run by the code under
+# test, commits as this identity and ignores the developer's global and
+# system config, so results don't depend on the machine running the tests.
+_GIT_TEST_ENV = {
+    "GIT_AUTHOR_NAME": "Test User",
+    "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "Test User",
+    "GIT_COMMITTER_EMAIL": "test@example.com",
+    "GIT_CONFIG_GLOBAL": os.devnull,
+    "GIT_CONFIG_SYSTEM": os.devnull,
+}
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    os.environ.update(_GIT_TEST_ENV)
+
+    # pytest keeps its numbered, locked pytest-of-<user>/pytest-N directories
+    # under PYTEST_DEBUG_TEMPROOT, which it reads when the tmp_path factory is
+    # first used, after this hook. An explicit --basetemp still wins.
+    tmpfs = os.environ.get("PYTEST_TMPFS")
+    if tmpfs is None and os.access(_DEFAULT_TMPFS, os.W_OK):
+        tmpfs = str(_DEFAULT_TMPFS)
+    if tmpfs:
+        os.environ["PYTEST_DEBUG_TEMPROOT"] = tmpfs
+
+
+@pytest.fixture(autouse=True)
+def _fresh_workflow_config():
+    """Start and end every test with an empty `workflow.*` config cache."""
+    clear_workflow_config_cache()
+    yield
+    clear_workflow_config_cache()
+
+
+def _init_test_repo(repo: Path) -> None:
+    """Initialize `repo` as a git repository with an initial commit on `main`."""
+    repo.mkdir()
+    (repo / "README.md").write_text("# Test Repo\n")
+
+    # One shell for the whole sequence instead of a process per git command.
+    # An empty --template skips copying sample hooks into every repository;
+    # test repositories are disposable, so skip fsync and automatic gc too.
+    # Commits get their identity from the environment; user.email is still
+    # set locally because tests read it back through `git config`. The
+    # initial commit has a fixed date in the past, so tests can date later
+    # commits relative to it without depending on today's date.
+    sh(
+        "git init -q --template= --initial-branch=main &&"
+        " git config core.fsync none &&"
+        " git config gc.auto 0 &&"
+        " git config user.email test@example.com &&"
+        " git add README.md &&"
+        " GIT_AUTHOR_DATE=2000-01-01T00:00:00 GIT_COMMITTER_DATE=2000-01-01T00:00:00"
+        " git commit -q -m 'Initial commit'",
+        cwd=repo,
+    )
+
+
+def _clone_tree(src: Path, dst: Path) -> None:
+    """
+    Copy the directory tree at `src` to `dst`, which must not exist yet.
+
+    Git's object files, which git never modifies in place, are hardlinked
+    and everything else is copied. On macOS a clonefile(2) copy (`cp -c`) is
+    tried first, since APFS clones share data without linking; elsewhere the
+    in-process copy is faster than spawning `cp`, which can't reflink on
+    tmpfs anyway.
+
+    Raises:
+        FileExistsError: If `dst` already exists
+    """
+    # `cp -R src dst` would quietly copy into dst/<name> instead
+    if dst.exists():
+        raise FileExistsError(dst)
+
+    if sys.platform == "darwin":
+        result = subprocess.run(
+            ["cp", "-R", "-c", str(src), str(dst)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if result.returncode == 0:
+            return
+        shutil.rmtree(dst, ignore_errors=True)
+
+    def link_objects(path: str, target: str) -> None:
+        parts = Path(path).relative_to(src).parts
+        if parts[:1] == ("objects",) or parts[:2] == (".git", "objects"):
+            os.link(path, target)
+        else:
+            shutil.copy2(path, target)
+
+    shutil.copytree(src, dst, symlinks=True, copy_function=link_objects)
+
 
 @pytest.fixture
-def git_repo(tmp_path):
+def git_config_env(monkeypatch):
+    """
+    Supply git config through the environment instead of a config file.
+
+    Returns a function taking a `{key: value}` dict; the entries are exported
+    as `GIT_CONFIG_COUNT`/`GIT_CONFIG_KEY_<n>`/`GIT_CONFIG_VALUE_<n>`, which
+    every git process started during the test reads as command-line config.
+    Nothing is written to disk, and the variables are removed afterwards.
+
+    Returns:
+        Callable[[dict[str, str]], None]: Function that sets the entries
+    """
+    def set_entries(entries: dict[str, str]) -> None:
+        monkeypatch.setenv("GIT_CONFIG_COUNT", str(len(entries)))
+        for i, (key, value) in enumerate(entries.items()):
+            monkeypatch.setenv(f"GIT_CONFIG_KEY_{i}", key)
+            monkeypatch.setenv(f"GIT_CONFIG_VALUE_{i}", value)
+
+    return set_entries
+
+
+@pytest.fixture(scope="session")
+def cached_cwd():
+    """
+    The working directory the session started in, looked up once.
+
+    Tests that change directory use `monkeypatch.chdir`, which restores it,
+    so this stays the current directory outside such tests.
+
+    Returns:
+        Path: The session's working directory
+    """
+    return Path.cwd()
+
+
+@pytest.fixture(scope="session")
+def _pristine_repo(tmp_path_factory):
+    """
+    Build the baseline test repository once per session.
+
+    Tests never use this directly; `git_repo` hands each test its own copy.
+
+    Returns:
+        Path: Path to the pristine repository
+    """
+    repo = tmp_path_factory.mktemp("pristine") / "test-repo"
+    _init_test_repo(repo)
+    return repo
+
+
+@pytest.fixture
+def git_repo(tmp_path, _pristine_repo):
     """
     Create a temporary git repository for testing.
 
+    The repository is copied from a session-wide pristine rather than
+    initialized from scratch for every test.
+
     Returns:
         Path: Path to the temporary git repository
     """
     repo = tmp_path / "test-repo"
-    repo.mkdir()
+    _clone_tree(_pristine_repo, repo)
+    return repo
 
-    # Initialize git repo
-    subprocess.run(["git", "init"], cwd=repo, check=True, capture_output=True)
-    subprocess.run(
-        ["git", "config", "user.email", "test@example.com"],
-        cwd=repo,
-        check=True,
-        capture_output=True,
-    )
-    subprocess.run(
-        ["git", "config", "user.name", "Test User"],
-        cwd=repo,
-        check=True,
-        capture_output=True,
-    )
 
-    # Create initial commit
-    (repo / "README.md").write_text("# Test Repo\n")
-    subprocess.run(["git", "add", "README.md"], cwd=repo, check=True, capture_output=True)
-    subprocess.run(
-        ["git", "commit", "-m", "Initial commit"],
-        cwd=repo,
-        check=True,
-        capture_output=True,
+@pytest.fixture(scope="session")
+def _pristine_remote(tmp_path_factory, _pristine_repo):
+    """
+    Build a bare remote holding the pristine repository's `main`, once per session.
+
+    Tests never use this directly; `git_repo_with_remote` hands each test
+    its own copy.
+
+    Returns:
+        Path: Path to the pristine bare repository
+    """
+    remote_repo = tmp_path_factory.mktemp("pristine-remote") / "remote"
+
+    # Pushing to a path rather than a named remote leaves the pristine's
+    # refs and config untouched
+    sh(
+        f"git init -q --bare --template= {shlex.quote(str(remote_repo))} &&"
+        f" git -C {shlex.quote(str(remote_repo))} config core.fsync none &&"
+        f" git -C {shlex.quote(str(remote_repo))} config gc.auto 0 &&"
+        f" git push -q {shlex.quote(str(remote_repo))} main",
+        cwd=_pristine_repo,
     )
 
-    return repo
+    return remote_repo
 
 
 @pytest.fixture
-def git_repo_with_remote(tmp_path, git_repo):
+def git_repo_with_remote(git_repo, _pristine_remote):
     """
     Create a git repository with a remote (bare repo).
 
+    The repository is `git_repo` itself; the remote is copied from a
+    session-wide pristine, and `origin` plus `main`'s upstream are recorded
+    in-process as `git push -u origin main` would leave them.
+
     Returns:
         tuple: (main_repo_path, remote_repo_path)
     """
-    remote_repo = tmp_path / "remote"
-    remote_repo.mkdir()
-    subprocess.run(["git", "init", "--bare"], cwd=remote_repo, check=True, capture_output=True)
+    remote_repo = git_repo.parent / "remote"
+    _clone_tree(_pristine_remote, remote_repo)
 
-    # Add remote and push main
-    subprocess.run(
-        ["git", "remote", "add", "origin", str(remote_repo)],
-        cwd=git_repo,
-        check=True,
-        capture_output=True,
-    )
-    subprocess.run(
-        ["git", "push", "-u", "origin", "main"],
-        cwd=git_repo,
-        check=True,
-        capture_output=True,
-    )
+    write_git_config(git_repo, {
+        "remote.origin.url": str(remote_repo),
+        "remote.origin.fetch": "+refs/heads/*:refs/remotes/origin/*",
+        "branch.main.remote": "origin",
+        "branch.main.merge": "refs/heads/main",
+    })
+    make_branches(git_repo, {"refs/remotes/origin/main": "main"})
 
     return git_repo, remote_repo
+
+
+@pytest.fixture(scope="session")
+def envrc_blob(tmp_path_factory):
+    """
+    A session-wide file containing `export SAMPLE=1`.
+
+    Tests symlink to it instead of writing their own copy, so they must not
+    write through the link.
+
+    Returns:
+        Path: Path to the file
+    """
+    blob = tmp_path_factory.mktemp("envrc") / "envrc.sample"
+    blob.write_text("export SAMPLE=1")
+    return blob
+
+
+@pytest.fixture(scope="session")
+def shared_template(tmp_path_factory):
+    """
+    A session-wide user template holding `.envrc.local` and `.custom`.
+
+    For tests that only read the template; link mode points the repository
+    at these files, so nothing may write through the created symlinks.
+
+    Returns:
+        Path: Path to the template directory
+    """
+    template = tmp_path_factory.mktemp("tmpl")
+    (template / ".envrc.local").write_text("export LOCAL=1")
+    (template / ".custom").write_text("custom")
+    return template
+
+
+@pytest.fixture(scope="session")
+def template_skeleton(tmp_path_factory):
+    """
+    A session-wide user-template directory tree.
+
+    Contains `.ipython/config.py` and `.ipython/startup/00-imports.py`.
+    Tests copy it with hardlinks rather than writing the files themselves,
+    so they must not modify the files in place.
+
+    Returns:
+        Path: Path to the skeleton template directory
+    """
+    skeleton = tmp_path_factory.mktemp("skel")
+    startup = skeleton / ".ipython" / "startup"
+    startup.mkdir(parents=True)
+    (skeleton / ".ipython" / "config.py").write_text("# config")
+    (startup / "00-imports.py").write_text("import os")
+    return skeleton
@@ -15,13 +15,13 @@ from git_workflow_utils.paths import (
 class TestResolvePath:
     """Tests for resolve_path function."""
 
-    def test_none_returns_cwd(self):
+    def test_none_returns_cwd(self, cached_cwd):
         result = resolve_path(None)
-        assert result == Path.cwd()
+        assert result == cached_cwd
 
-    def test_empty_string_returns_cwd(self):
+    def test_empty_string_returns_cwd(self, cached_cwd):
         result = resolve_path("")
-        assert result == Path.cwd()
+        assert result == cached_cwd
 
     def test_expands_tilde(self):
         result = resolve_path("~/test")
@@ -1,10 +1,12 @@
 """Tests for templates module."""
 
-import subprocess
+import os
+import shutil
 from pathlib import Path
 
 import pytest
 
+from _git_helpers import write_git_config
 from git_workflow_utils.templates import apply_user_template, symlink_envrc_if_needed
 
 
@@ -21,10 +23,10 @@ class TestSymlinkEnvrcIfNeeded:
         assert envrc.is_file()
         assert not envrc.is_symlink()
 
-    def test_creates_symlink_from_sample(self, git_repo):
+    def test_creates_symlink_from_sample(self, git_repo, envrc_blob):
         """Should create symlink from .envrc.sample if .envrc doesn't exist."""
         envrc_sample = git_repo / ".envrc.sample"
-        envrc_sample.write_text("export SAMPLE=1")
+        envrc_sample.symlink_to(envrc_blob)
 
         result = symlink_envrc_if_needed(git_repo)
         envrc = git_repo / ".envrc"
@@ -51,13 +53,13 @@ class TestSymlinkEnvrcIfNeeded:
         assert envrc.is_symlink()
         assert envrc.readlink() == Path(".envrc.template")
 
-    def test_doesnt_overwrite_existing_envrc(self, git_repo):
+    def test_doesnt_overwrite_existing_envrc(self, git_repo, envrc_blob):
         """Should not overwrite .envrc if it already exists."""
         envrc = git_repo / ".envrc"
         envrc.write_text("export EXISTING=1")
 
         envrc_sample = git_repo / ".envrc.sample"
-        envrc_sample.write_text("export SAMPLE=1")
+        envrc_sample.symlink_to(envrc_blob)
 
         result = symlink_envrc_if_needed(git_repo)
 
@@ -74,72 +76,40 @@ class TestApplyUserTemplate:
         # Should not raise
         apply_user_template(git_repo)
 
-    def test_raises_when_template_exists_but_no_mode_configured(self, git_repo, tmp_path):
+    def test_raises_when_template_exists_but_no_mode_configured(self, git_repo, shared_template):
         """Should raise RuntimeError if template exists but mode not configured."""
-        template_dir = tmp_path / "template"
-        template_dir.mkdir()
-        (template_dir / ".envrc.local").write_text("export LOCAL=1")
-
         with pytest.raises(RuntimeError, match="worktree.userTemplate.mode is not configured"):
-            apply_user_template(git_repo, template_path=template_dir)
+            apply_user_template(git_repo, template_path=shared_template)
 
-    def test_raises_on_invalid_mode(self, git_repo, tmp_path):
+    def test_raises_on_invalid_mode(self, git_repo, shared_template):
         """Should raise RuntimeError if mode is invalid."""
-        template_dir = tmp_path / "template"
-        template_dir.mkdir()
-        (template_dir / ".envrc.local").write_text("export LOCAL=1")
-
         # Set invalid mode
-        subprocess.run(
-            ["git", "config", "worktree.userTemplate.mode", "invalid"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        write_git_config(git_repo, {"worktree.userTemplate.mode": "invalid"})
 
         with pytest.raises(RuntimeError, match="Invalid worktree.userTemplate.mode"):
-            apply_user_template(git_repo, template_path=template_dir)
+            apply_user_template(git_repo, template_path=shared_template)
 
-    def test_symlinks_files_in_link_mode(self, git_repo, tmp_path):
+    def test_symlinks_files_in_link_mode(self, git_repo, shared_template):
         """Should create symlinks when mode is 'link'."""
-        template_dir = tmp_path / "template"
-        template_dir.mkdir()
-        (template_dir / ".envrc.local").write_text("export LOCAL=1")
-        (template_dir / ".custom").write_text("custom content")
-
         # Configure link mode
-        subprocess.run(
-            ["git", "config", "worktree.userTemplate.mode", "link"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        write_git_config(git_repo, {"worktree.userTemplate.mode": "link"})
 
-        apply_user_template(git_repo, template_path=template_dir)
+        apply_user_template(git_repo, template_path=shared_template)
 
         envrc_local = git_repo / ".envrc.local"
         custom = git_repo / ".custom"
 
         assert envrc_local.is_symlink()
-        assert envrc_local.resolve() == (template_dir / ".envrc.local").resolve()
+        assert envrc_local.resolve() == (shared_template / ".envrc.local").resolve()
         assert custom.is_symlink()
-        assert custom.resolve() == (template_dir / ".custom").resolve()
+        assert custom.resolve() == (shared_template / ".custom").resolve()
 
-    def test_copies_files_in_copy_mode(self, git_repo, tmp_path):
+    def test_copies_files_in_copy_mode(self, git_repo, shared_template):
         """Should copy files when mode is 'copy'."""
-        template_dir = tmp_path / "template"
-        template_dir.mkdir()
-        (template_dir / ".envrc.local").write_text("export LOCAL=1")
-
         # Configure copy mode
-        subprocess.run(
-            ["git", "config", "worktree.userTemplate.mode", "copy"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        write_git_config(git_repo, {"worktree.userTemplate.mode": "copy"})
 
-        apply_user_template(git_repo, template_path=template_dir)
+        apply_user_template(git_repo, template_path=shared_template)
 
         envrc_local = git_repo / ".envrc.local"
 
@@ -147,23 +117,13 @@ class TestApplyUserTemplate:
         assert not envrc_local.is_symlink()
         assert envrc_local.read_text() == "export LOCAL=1"
 
-    def test_copies_directories_in_copy_mode(self, git_repo, tmp_path):
+    def test_copies_directories_in_copy_mode(self, git_repo, tmp_path, template_skeleton):
         """Should recursively copy directories when mode is 'copy'."""
         template_dir = tmp_path / "template"
-        template_dir.mkdir()
-        ipython_dir = template_dir / ".ipython"
-        ipython_dir.mkdir()
-        (ipython_dir / "config.py").write_text("# config")
-        (ipython_dir / "startup").mkdir()
-        (ipython_dir / "startup" / "00-imports.py").write_text("import os")
+        shutil.copytree(template_skeleton, template_dir, copy_function=os.link)
 
         # Configure copy mode
-        subprocess.run(
-            ["git", "config", "worktree.userTemplate.mode", "copy"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        write_git_config(git_repo, {"worktree.userTemplate.mode": "copy"})
 
         apply_user_template(git_repo, template_path=template_dir)
 
@@ -174,28 +134,15 @@ class TestApplyUserTemplate:
         assert (ipython / "config.py").read_text() == "# config"
         assert (ipython / "startup" / "00-imports.py").read_text() == "import os"
 
-    def test_per_file_override_link_in_copy_mode(self, git_repo, tmp_path):
+    def test_per_file_override_link_in_copy_mode(self, git_repo, shared_template):
         """Should respect per-file overrides (link specific file in copy mode)."""
-        template_dir = tmp_path / "template"
-        template_dir.mkdir()
-        (template_dir / ".envrc.local").write_text("export LOCAL=1")
-        (template_dir / ".custom").write_text("custom")
-
         # Configure copy mode but override .envrc.local to link
-        subprocess.run(
-            ["git", "config", "worktree.userTemplate.mode", "copy"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "--add", "worktree.userTemplate.link", ".envrc.local"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        write_git_config(git_repo, {
+            "worktree.userTemplate.mode": "copy",
+            "worktree.userTemplate.link": ".envrc.local",
+        })
 
-        apply_user_template(git_repo, template_path=template_dir)
+        apply_user_template(git_repo, template_path=shared_template)
 
         envrc_local = git_repo / ".envrc.local"
         custom = git_repo / ".custom"
@@ -203,28 +150,15 @@ class TestApplyUserTemplate:
         assert envrc_local.is_symlink()  # Overridden to link
         assert not custom.is_symlink()   # Default copy
 
-    def test_per_file_override_copy_in_link_mode(self, git_repo, tmp_path):
+    def test_per_file_override_copy_in_link_mode(self, git_repo, shared_template):
         """Should respect per-file overrides (copy specific file in link mode)."""
-        template_dir = tmp_path / "template"
-        template_dir.mkdir()
-        (template_dir / ".envrc.local").write_text("export LOCAL=1")
-        (template_dir / ".custom").write_text("custom")
-
         # Configure link mode but override .custom to copy
-        subprocess.run(
-            ["git", "config", "worktree.userTemplate.mode", "link"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "--add", "worktree.userTemplate.copy", ".custom"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        write_git_config(git_repo, {
+            "worktree.userTemplate.mode": "link",
+            "worktree.userTemplate.copy": ".custom",
+        })
 
-        apply_user_template(git_repo, template_path=template_dir)
+        apply_user_template(git_repo, template_path=shared_template)
 
         envrc_local = git_repo / ".envrc.local"
         custom = git_repo / ".custom"
@@ -232,25 +166,15 @@ class TestApplyUserTemplate:
         assert envrc_local.is_symlink()  # Default link
         assert not custom.is_symlink()   # Overridden to copy
 
-    def test_skips_existing_files(self, git_repo, tmp_path):
+    def test_skips_existing_files(self, git_repo, shared_template):
         """Should not overwrite files that already exist."""
         # Create existing file
         existing = git_repo / ".envrc.local"
         existing.write_text("export EXISTING=1")
 
-        template_dir = tmp_path / "template"
-        template_dir.mkdir()
-        (template_dir / ".envrc.local").write_text("export TEMPLATE=1")
-        (template_dir / ".custom").write_text("custom")
+        write_git_config(git_repo, {"worktree.userTemplate.mode": "link"})
 
-        subprocess.run(
-            ["git", "config", "worktree.userTemplate.mode", "link"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
-
-        apply_user_template(git_repo, template_path=template_dir)
+        apply_user_template(git_repo, template_path=shared_template)
 
         # Existing file should not be touched
         assert existing.read_text() == "export EXISTING=1"
@@ -270,37 +194,20 @@ class TestApplyUserTemplate:
         # Mock home directory
         monkeypatch.setenv("HOME", str(tmp_path))
 
-        subprocess.run(
-            ["git", "config", "worktree.userTemplate.mode", "link"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        write_git_config(git_repo, {"worktree.userTemplate.mode": "link"})
 
         apply_user_template(git_repo)
 
         envrc_local = git_repo / ".envrc.local"
         assert envrc_local.is_symlink()
 
-    def test_uses_git_config_path(self, git_repo, tmp_path):
+    def test_uses_git_config_path(self, git_repo, shared_template):
         """Should use path from git config worktree.userTemplate.path."""
-        template_dir = tmp_path / "my-custom-template"
-        template_dir.mkdir()
-        (template_dir / ".envrc.local").write_text("export LOCAL=1")
-
         # Configure custom path and mode
-        subprocess.run(
-            ["git", "config", "worktree.userTemplate.path", str(template_dir)],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "worktree.userTemplate.mode", "link"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        write_git_config(git_repo, {
+            "worktree.userTemplate.path": str(shared_template),
+            "worktree.userTemplate.mode": "link",
+        })
 
         apply_user_template(git_repo)
 
@@ -1,12 +1,12 @@
 """Tests for workflow module."""
 
-import subprocess
-
 import pytest
 
+from _git_helpers import fabricate_worktree, run_git_fast, set_config, write_git_config
 from git_workflow_utils.workflow import (
     _extract_repo_name_from_url,
     _parse_csv_config,
+    clear_workflow_config_cache,
     expand_format,
     get_exclude_patterns,
     get_local_branch_format,
@@ -30,136 +30,99 @@ class TestGetWorkflowConfig:
         assert value is None
 
     def test_returns_value_when_set(self, git_repo):
-        subprocess.run(
-            ["git", "config", "workflow.ticket.prefix", "SE-"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        set_config(git_repo, "workflow.ticket.prefix", "SE-")
         value = get_workflow_config("ticket.prefix", repo=git_repo)
         assert value == "SE-"
 
     def test_value_overrides_default(self, git_repo):
-        subprocess.run(
-            ["git", "config", "workflow.ticket.prefix", "JIRA-"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        set_config(git_repo, "workflow.ticket.prefix", "JIRA-")
         value = get_workflow_config("ticket.prefix", repo=git_repo, default="DEFAULT")
         assert value == "JIRA-"
 
     def test_works_with_nested_keys(self, git_repo):
-        subprocess.run(
-            ["git", "config", "workflow.branch.localFormat", "%(ticket)-%(desc)"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        set_config(git_repo, "workflow.branch.localFormat", "%(ticket)-%(desc)")
         value = get_workflow_config("branch.localFormat", repo=git_repo)
         assert value == "%(ticket)-%(desc)"
 
+    def test_caches_value_until_cleared(self, git_repo):
+        set_config(git_repo, "workflow.ticket.prefix", "SE-")
+        assert get_workflow_config("ticket.prefix", repo=git_repo) == "SE-"
 
-class TestExpandFormat:
-    """Tests for expand_format function."""
-
-    def test_replaces_single_placeholder(self):
-        result = expand_format("prefix-%(ticket)", ticket="SE-123")
-        assert result == "prefix-SE-123"
-
-    def test_replaces_multiple_placeholders(self):
-        result = expand_format(
-            "%(type)/%(owner)/%(ticket)-%(desc)",
-            type="feature",
-            owner="wolf",
-            ticket="SE-123",
-            desc="add-stuff",
-        )
-        assert result == "feature/wolf/SE-123-add-stuff"
+        set_config(git_repo, "workflow.ticket.prefix", "JIRA-")
+        assert get_workflow_config("ticket.prefix", repo=git_repo) == "SE-"
 
-    def test_leaves_unknown_placeholders_unchanged(self):
-        result = expand_format("%(known)-%(unknown)", known="value")
-        assert result == "value-%(unknown)"
+        clear_workflow_config_cache()
+        assert get_workflow_config("ticket.prefix", repo=git_repo) == "JIRA-"
 
-    def test_handles_no_placeholders(self):
-        result = expand_format("no placeholders here")
-        assert result == "no placeholders here"
 
-    def test_handles_empty_string(self):
-        result = expand_format("")
-        assert result == ""
-
-    def test_handles_adjacent_placeholders(self):
-        result = expand_format("%(a)%(b)%(c)", a="1", b="2", c="3")
-        assert result == "123"
-
-    def test_placeholder_at_start(self):
-        result = expand_format("%(ticket)-description", ticket="SE-123")
-        assert result == "SE-123-description"
+class TestExpandFormat:
+    """Tests for expand_format function."""
 
-    def test_placeholder_at_end(self):
-        result = expand_format("description-%(ticket)", ticket="SE-123")
-        assert result == "description-SE-123"
+    @pytest.mark.parametrize(("format_string", "placeholders", "expected"), [
+        pytest.param(
+            "prefix-%(ticket)", {"ticket": "SE-123"}, "prefix-SE-123",
+            id="single_placeholder",
+        ),
+        pytest.param(
+            "%(type)/%(owner)/%(ticket)-%(desc)",
+            {"type": "feature", "owner": "wolf", "ticket": "SE-123", "desc": "add-stuff"},
+            "feature/wolf/SE-123-add-stuff",
+            id="multiple_placeholders",
+        ),
+        pytest.param(
+            "%(known)-%(unknown)", {"known": "value"}, "value-%(unknown)",
+            id="unknown_placeholder_unchanged",
+        ),
+        pytest.param(
+            "no placeholders here", {}, "no placeholders here",
+            id="no_placeholders",
+        ),
+        pytest.param("", {}, "", id="empty_string"),
+        pytest.param(
+            "%(a)%(b)%(c)", {"a": "1", "b": "2", "c": "3"}, "123",
+            id="adjacent_placeholders",
+        ),
+        pytest.param(
+            "%(ticket)-description", {"ticket": "SE-123"}, "SE-123-description",
+            id="placeholder_at_start",
+        ),
+        pytest.param(
+            "description-%(ticket)", {"ticket": "SE-123"}, "description-SE-123",
+            id="placeholder_at_end",
+        ),
+    ])
+    def test_expands(self, format_string, placeholders, expected):
+        assert expand_format(format_string, **placeholders) == expected
 
 
 class TestExtractRepoNameFromUrl:
     """Tests for _extract_repo_name_from_url helper."""
 
-    def test_https_url_with_git_suffix(self):
-        name = _extract_repo_name_from_url("https://github.com/user/my-repo.git")
-        assert name == "my-repo"
-
-    def test_https_url_without_git_suffix(self):
-        name = _extract_repo_name_from_url("https://github.com/user/my-repo")
-        assert name == "my-repo"
-
-    def test_ssh_url_with_git_suffix(self):
-        name = _extract_repo_name_from_url("git@github.com:user/my-repo.git")
-        assert name == "my-repo"
-
-    def test_ssh_url_without_git_suffix(self):
-        name = _extract_repo_name_from_url("git@github.com:user/my-repo")
-        assert name == "my-repo"
-
-    def test_local_path(self):
-        name = _extract_repo_name_from_url("/path/to/my-repo.git")
-        assert name == "my-repo"
-
-    def test_trailing_slash(self):
-        name = _extract_repo_name_from_url("https://github.com/user/my-repo.git/")
-        assert name == "my-repo"
-
-    def test_nested_path(self):
-        name = _extract_repo_name_from_url("https://github.com/org/team/my-repo.git")
-        assert name == "my-repo"
-
-    def test_bitbucket_ssh(self):
-        name = _extract_repo_name_from_url("git@bitbucket.org:company/project.git")
-        assert name == "project"
+    @pytest.mark.parametrize(("url", "expected"), [
+        pytest.param("https://github.com/user/my-repo.git", "my-repo", id="https_url_with_git_suffix"),
+        pytest.param("https://github.com/user/my-repo", "my-repo", id="https_url_without_git_suffix"),
+        pytest.param("git@github.com:user/my-repo.git", "my-repo", id="ssh_url_with_git_suffix"),
+        pytest.param("git@github.com:user/my-repo", "my-repo", id="ssh_url_without_git_suffix"),
+        pytest.param("/path/to/my-repo.git", "my-repo", id="local_path"),
+        pytest.param("https://github.com/user/my-repo.git/", "my-repo", id="trailing_slash"),
+        pytest.param("https://github.com/org/team/my-repo.git", "my-repo", id="nested_path"),
+        pytest.param("git@bitbucket.org:company/project.git", "project", id="bitbucket_ssh"),
+    ])
+    def test_extracts_name(self, url, expected):
+        assert _extract_repo_name_from_url(url) == expected
 
 
 class TestGetProjectName:
     """Tests for get_project_name function."""
 
     def test_returns_config_override(self, git_repo):
-        subprocess.run(
-            ["git", "config", "workflow.project.name", "my-project"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        set_config(git_repo, "workflow.project.name", "my-project")
         name = get_project_name(git_repo)
         assert name == "my-project"
 
-    def test_returns_remote_name_when_no_config(self, git_repo_with_remote):
-        git_repo, _ = git_repo_with_remote
-        # The fixture creates a bare repo as remote, so let's set a proper URL
-        subprocess.run(
-            ["git", "remote", "set-url", "origin", "https://github.com/user/test-repo.git"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+    def test_returns_remote_name_when_no_config(self, git_repo):
+        # Only the URL is read, so the remote needn't exist
+        write_git_config(git_repo, {"remote.origin.url": "https://github.com/user/test-repo.git"})
         name = get_project_name(git_repo)
         assert name == "test-repo"
 
@@ -168,32 +131,18 @@ class TestGetProjectName:
         name = get_project_name(git_repo)
         assert name == "test-repo"  # The fixture creates repo in "test-repo" directory
 
-    def test_config_takes_precedence_over_remote(self, git_repo_with_remote):
-        git_repo, _ = git_repo_with_remote
-        subprocess.run(
-            ["git", "remote", "set-url", "origin", "https://github.com/user/remote-name.git"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "workflow.project.name", "config-name"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+    def test_config_takes_precedence_over_remote(self, git_repo):
+        write_git_config(git_repo, {
+            "remote.origin.url": "https://github.com/user/remote-name.git",
+            "workflow.project.name": "config-name",
+        })
         name = get_project_name(git_repo)
         assert name == "config-name"
 
     def test_works_in_worktree(self, git_repo, tmp_path):
         # Create a worktree
         worktree_path = tmp_path / "worktree"
-        subprocess.run(
-            ["git", "worktree", "add", str(worktree_path), "-b", "feature"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        fabricate_worktree(git_repo, worktree_path)
         # Project name should still be from main repo
         name = get_project_name(worktree_path)
         assert name == "test-repo"
@@ -209,14 +158,9 @@ class TestGetOwner:
     def test_returns_unknown_when_no_email(self, tmp_path):
         repo = tmp_path / "no-email-repo"
         repo.mkdir()
-        subprocess.run(["git", "init"], cwd=repo, check=True, capture_output=True)
+        run_git_fast("init", cwd=repo)
         # Unset any inherited email config
-        subprocess.run(
-            ["git", "config", "user.email", ""],
-            cwd=repo,
-            check=True,
-            capture_output=True,
-        )
+        run_git_fast("config", "user.email", "", cwd=repo)
         owner = get_owner(repo)
         # May return "unknown" or extract from global config; depends on environment
         assert isinstance(owner, str)
@@ -231,20 +175,15 @@ class TestGetOwner:
 class TestParseCSVConfig:
     """Tests for _parse_csv_config helper."""
 
-    def test_single_value(self):
-        assert _parse_csv_config("prod") == ["prod"]
-
-    def test_multiple_values(self):
-        assert _parse_csv_config("prod,develop") == ["prod", "develop"]
-
-    def test_strips_whitespace(self):
-        assert _parse_csv_config(" prod , develop , main ") == ["prod", "develop", "main"]
-
-    def test_filters_empty_items(self):
-        assert _parse_csv_config("prod,,develop") == ["prod", "develop"]
-
-    def test_empty_string(self):
-        assert _parse_csv_config("") == []
+    @pytest.mark.parametrize(("value", "expected"), [
+        pytest.param("prod", ["prod"], id="single_value"),
+        pytest.param("prod,develop", ["prod", "develop"], id="multiple_values"),
+        pytest.param(" prod , develop , main ", ["prod", "develop", "main"], id="strips_whitespace"),
+        pytest.param("prod,,develop", ["prod", "develop"], id="filters_empty_items"),
+        pytest.param("", [], id="empty_string"),
+    ])
+    def test_parses(self, value, expected):
+        assert _parse_csv_config(value) == expected
 
 
 class TestGetLocalBranchFormat:
@@ -254,12 +193,7 @@ class TestGetLocalBranchFormat:
         assert get_local_branch_format(git_repo) == "%(desc)"
 
     def test_returns_configured_value(self, git_repo):
-        subprocess.run(
-            ["git", "config", "workflow.branch.localFormat", "%(ticket)-%(desc)"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        set_config(git_repo, "workflow.branch.localFormat", "%(ticket)-%(desc)")
         assert get_local_branch_format(git_repo) == "%(ticket)-%(desc)"
 
 
@@ -270,12 +204,7 @@ class TestGetRemoteBranchFormat:
         assert get_remote_branch_format(git_repo) == "%(type)/%(owner)/%(ticket)-%(desc)"
 
     def test_returns_configured_value(self, git_repo):
-        subprocess.run(
-            ["git", "config", "workflow.branch.remoteFormat", "%(owner)/%(ticket)"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        set_config(git_repo, "workflow.branch.remoteFormat", "%(owner)/%(ticket)")
         assert get_remote_branch_format(git_repo) == "%(owner)/%(ticket)"
 
 
@@ -286,12 +215,7 @@ class TestGetPriorityBranches:
         assert get_priority_branches(git_repo) == ["prod", "develop"]
 
     def test_returns_configured_value(self, git_repo):
-        subprocess.run(
-            ["git", "config", "workflow.branches.priority", "main, develop, staging"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        set_config(git_repo, "workflow.branches.priority", "main, develop, staging")
         assert get_priority_branches(git_repo) == ["main", "develop", "staging"]
 
 
@@ -302,10 +226,5 @@ class TestGetExcludePatterns:
         assert get_exclude_patterns(git_repo) == ["*archive/*"]
 
     def test_returns_configured_value(self, git_repo):
-        subprocess.run(
-            ["git", "config", "workflow.branches.exclude", "*archive/*, wip/*"],
-            cwd=git_repo,
-            check=True,
-            capture_output=True,
-        )
+        set_config(git_repo, "workflow.branches.exclude", "*archive/*, wip/*")
         assert get_exclude_patterns(git_repo) == ["*archive/*", "wip/*"]